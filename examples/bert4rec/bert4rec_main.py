@@ -67,6 +67,9 @@ except ImportError:
     pass
 
 
+_PROGRESS_BAR_UPDATE_STEPS = 64
+
+
 def parse_args(argv: List[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="torchrec + lightning app")
     parser.add_argument(
@@ -270,37 +273,48 @@ def _train_one_epoch(
         None.
     """
     model.train()
+    rank = dist.get_rank()
+    world_size = dist.get_world_size()
     if torch.cuda.is_available():
-        torch.cuda.set_device(dist.get_rank())
+        torch.cuda.set_device(rank)
     loss_logs = []
     train_iterator = iter(train_loader)
     ce = nn.CrossEntropyLoss(ignore_index=0)
-    outputs = [None for _ in range(dist.get_world_size())]
-    for _ in tqdm(iter(int, 1), desc=f"Epoch {epoch+1}"):
+    outputs = [None for _ in range(world_size)]
+    progress_bar = tqdm(desc=f"Epoch {epoch+1}")
+    step = 0
+    while True:
         try:
             batch = next(train_iterator)
-            batch = [x.to(device) for x in batch]
+        except StopIteration:
+            break
+        batch = [x.to(device) for x in batch]
 
-            optimizer.zero_grad()
-            seqs, labels = batch
+        optimizer.zero_grad()
+        seqs, labels = batch
 
-            kjt = _to_kjt(seqs, device)
-            logits = model(kjt)  # B x T x V
+        kjt = _to_kjt(seqs, device)
+        logits = model(kjt)  # B x T x V
 
-            logits = logits.view(-1, logits.size(-1))  # (B*T) x V
-            labels = labels.view(-1)  # B*T
-            loss = ce(logits, labels)
+        logits = logits.view(-1, logits.size(-1))  # (B*T) x V
+        labels = labels.view(-1)  # B*T
+        loss = ce(logits, labels)
 
-            loss.backward()
+        loss.backward()
 
-            optimizer.step()
+        optimizer.step()
 
-            loss_logs.append(loss.item())
+        loss_logs.append(loss.item())
 
-        except StopIteration:
-            break
+        step += 1
+        # Only touch the progress bar every _PROGRESS_BAR_UPDATE_STEPS steps to keep
+        # its bookkeeping off the per step path.
+        if step % _PROGRESS_BAR_UPDATE_STEPS == 0:
+            progress_bar.update(_PROGRESS_BAR_UPDATE_STEPS)
+    progress_bar.update(step % _PROGRESS_BAR_UPDATE_STEPS)
+    progress_bar.close()
     dist.all_gather_object(outputs, sum(loss_logs) / len(loss_logs))
-    if dist.get_rank() == 0:
+    if rank == 0:
         # pyre-fixme[6]: For 1st param expected `Iterable[Variable[_SumT (bound to
         #  _SupportsSum)]]` but got `List[None]`.
         print(f"Epoch {epoch + 1}, average loss { (sum(outputs) or 0) /len(outputs)}")
@@ -331,9 +345,11 @@ def _validate(
         None.
     """
     model.eval()
+    rank = dist.get_rank()
+    world_size = dist.get_world_size()
     if torch.cuda.is_available():
-        torch.cuda.set_device(dist.get_rank())
-    outputs = [None for _ in range(dist.get_world_size())]
+        torch.cuda.set_device(rank)
+    outputs = [None for _ in range(world_size)]
     keys = ["Recall@1", "Recall@5", "Recall@10", "NDCG@5", "NDCG@10"]
     metrics_log: Dict[str, List[float]] = {key: [] for key in keys}
 
@@ -350,7 +366,7 @@ def _validate(
         key: sum(values) / len(values) for key, values in metrics_log.items()
     }
     dist.all_gather_object(outputs, metrics_avg)
-    if dist.get_rank() == 0:
+    if rank == 0:
         print(
             # pyre-fixme[6] for 1st positional only parameter expected `List[Dict[str, float]]` but got `List[None]`
             f"{'Epoch ' + str(epoch + 1) if not is_testing else 'Test'}, metrics {_dict_mean(outputs)}"
@@ -44,9 +44,10 @@ class ParametricDataset(Dataset):
         self._label_file = None
         self._categorical_features_files = []
 
+        self._num_numerical_features = len(DEFAULT_INT_NAMES)
         self._numerical_bytes_per_batch = (
             bytes_per_feature[DEFAULT_INT_NAMES[0]]
-            * len(DEFAULT_INT_NAMES)
+            * self._num_numerical_features
             * batch_size
         )
         self._label_bytes_per_batch = np.dtype(np.float32).itemsize * batch_size
@@ -57,20 +58,14 @@ class ParametricDataset(Dataset):
         # Load categorical
         for feature_name in DEFAULT_CAT_NAMES:
             path_to_open = os.path.join(binary_file_path, f"{feature_name}.bin")
-            cat_file = os.open(path_to_open, os.O_RDONLY)
-            bytes_per_batch = bytes_per_feature[feature_name] * self._batch_size
-            batch_num_float = os.fstat(cat_file).st_size / bytes_per_batch
-            self._categorical_features_files.append(cat_file)
+            self._categorical_features_files.append(os.open(path_to_open, os.O_RDONLY))
 
         # Load numerical
         path_to_open = os.path.join(binary_file_path, "numerical.bin")
         self._numerical_features_file = os.open(path_to_open, os.O_RDONLY)
-        batch_num_float = (
-            os.fstat(self._numerical_features_file).st_size
-            / self._numerical_bytes_per_batch
-        )
 
-        # Load label
+        # Load label. All files hold the same number of rows, so the batch count is
+        # derived from the label file alone.
         path_to_open = os.path.join(binary_file_path, "label.bin")
         self._label_file = os.open(path_to_open, os.O_RDONLY)
         batch_num_float = (
@@ -130,7 +125,9 @@ class ParametricDataset(Dataset):
         )
         array = np.frombuffer(raw_numerical_data, dtype=np.float32)
         return (
-            torch.from_numpy(array).to(torch.float32).view(-1, len(DEFAULT_INT_NAMES))
+            torch.from_numpy(array)
+            .to(torch.float32)
+            .view(-1, self._num_numerical_features)
         )
 
     def _get_categorical_features(self, idx: int) -> Optional[torch.Tensor]:
@@ -198,6 +195,9 @@ class NvtBinaryDataloader:
         self,
         rank: int,
         world_size: int,
+        num_workers: int = 0,
+        prefetch_factor: int = 2,
+        pin_memory: bool = False,
     ) -> data_utils.DataLoader:
         sampler = DistributedSampler(
             self.dataset,
@@ -206,12 +206,18 @@ class NvtBinaryDataloader:
             shuffle=False,
             drop_last=False,
         )
+        # prefetch_factor is only accepted by the DataLoader when workers are used.
+        worker_kwargs = {"prefetch_factor": prefetch_factor} if num_workers > 0 else {}
         dataloader = data_utils.DataLoader(
             self.dataset,
             batch_size=None,
-            pin_memory=False,
+            pin_memory=pin_memory,
             collate_fn=self.collate_fn,
             sampler=sampler,
-            num_workers=0,
+            num_workers=num_workers,
+            # keep workers alive across epochs instead of starting new worker
+            # processes on each iter() of the dataloader.
+            persistent_workers=num_workers > 0,
+            **worker_kwargs,
         )
         return dataloader
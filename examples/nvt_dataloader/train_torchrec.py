@@ -7,11 +7,13 @@
 
 import argparse
 import os
+import random
 import sys
 import time
 
 from typing import cast, Iterator, List, Tuple
 
+import numpy as np
 import torch
 import torch.distributed as dist
 import torch.nn as nn
@@ -20,7 +22,6 @@ import torchrec
 import torchrec.distributed as trec_dist
 import torchrec.optim as trec_optim
 from nvt_binary_dataloader import NvtBinaryDataloader
-from pyre_extensions import none_throws
 from torchrec import EmbeddingBagCollection
 
 from torchrec.datasets.criteo import (
@@ -41,6 +42,9 @@ from torchrec.optim.keyed import KeyedOptimizerWrapper
 from torchrec.optim.optimizers import in_backward_optimizer_filter
 
 
+_METRIC_UPDATE_BATCHES = 16
+
+
 def parse_args(argv: List[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="torchrec dlrm example trainer")
     parser.add_argument(
@@ -96,6 +100,30 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
         default="/data/criteo_1tb/criteo_binary/split/",
         help="Location for binary datafiles",
     )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=0,
+        help="Number of data loader worker processes. Workers are kept alive across"
+        " epochs.",
+    )
+    parser.add_argument(
+        "--prefetch_factor",
+        type=int,
+        default=2,
+        help="Number of batches loaded in advance by each data loader worker. Only"
+        " used when num_workers > 0. Every prefetched batch is held in host memory"
+        " (page-locked when pin_memory is enabled), so large values combined with"
+        " large batch sizes can exhaust host RAM.",
+    )
+    parser.add_argument(
+        "--pin_memory",
+        dest="pin_memory",
+        action="store_true",
+        help="Use pinned memory when loading data. Off by default; pinned batches let"
+        " the host to device copy overlap with compute at the cost of page-locked"
+        " host memory.",
+    )
     parser.add_argument(
         "--change_lr",
         dest="change_lr",
@@ -134,32 +162,58 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
         action="store_true",
         help="Flag to determine if adagrad optimizer should be used.",
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducibility.",
+    )
     return parser.parse_args(argv)
 
 
 def _eval(
-    train_pipeline: TrainPipelineSparseDist, it: Iterator[Batch]
+    train_pipeline: TrainPipelineSparseDist,
+    it: Iterator[Batch],
+    cpu_process_group: dist.ProcessGroup,
 ) -> Tuple[float, float, float]:
     train_pipeline._model.eval()
 
     device = train_pipeline._device
-    auroc = metrics.AUROC(compute_on_step=False).to(device)
+    # AUROC keeps every (pred, label) pair until compute(), so it is accumulated on
+    # CPU to keep eval from growing device memory. Its cross-rank sync therefore
+    # needs a CPU capable (gloo) process group. Accuracy only keeps running counts
+    # and stays on device.
+    auroc = metrics.AUROC(compute_on_step=False, process_group=cpu_process_group)
     accuracy = metrics.Accuracy(compute_on_step=False).to(device)
     val_losses = []
+    # Metrics are updated once per _METRIC_UPDATE_BATCHES batches on the
+    # concatenated logits and labels rather than once per batch.
+    logits_buffer: List[torch.Tensor] = []
+    labels_buffer: List[torch.Tensor] = []
+
+    def update_metrics() -> None:
+        preds = torch.sigmoid(torch.cat(logits_buffer))
+        labels = torch.cat(labels_buffer).to(torch.int32)
+        auroc.update(preds.cpu(), labels.cpu())
+        accuracy.update(preds, labels)
+        logits_buffer.clear()
+        labels_buffer.clear()
+
     step = 0
     with torch.no_grad():
         while True:
             try:
                 loss, logits, labels = train_pipeline.progress(it)
                 val_losses.append(loss)
-                preds = torch.sigmoid(logits)
-
-                labels = labels.to(torch.int32)
-                auroc(preds, labels)
-                accuracy(preds, labels)
+                logits_buffer.append(logits)
+                labels_buffer.append(labels)
+                if len(logits_buffer) == _METRIC_UPDATE_BATCHES:
+                    update_metrics()
                 step += 1
             except StopIteration:
                 break
+        if logits_buffer:
+            update_metrics()
     auroc_result = auroc.compute().item()
     accuracy_result = accuracy.compute().item()
     bce_loss = torch.mean(torch.stack(val_losses))
@@ -168,6 +222,17 @@ def _eval(
 
 def main(argv: List[str]):
     args = parse_args(argv)
+    # Parse the comma separated int args once so the rest of main uses lists.
+    if args.num_embeddings_per_feature is not None:
+        args.num_embeddings_per_feature = list(
+            map(int, args.num_embeddings_per_feature.split(","))
+        )
+    args.dense_arch_layer_sizes = list(map(int, args.dense_arch_layer_sizes.split(",")))
+    args.over_arch_layer_sizes = list(map(int, args.over_arch_layer_sizes.split(",")))
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+        torch.manual_seed(args.seed)
     rank = int(os.environ["LOCAL_RANK"])
 
     print("Running with args", args)
@@ -185,32 +250,56 @@ def main(argv: List[str]):
 
     rank = dist.get_rank()
     world_size = dist.get_world_size()
-    num_embeddings_per_feature = None
-    if args.num_embeddings_per_feature is not None:
-        num_embeddings_per_feature = list(
-            map(int, args.num_embeddings_per_feature.split(","))
+    cpu_process_group = dist.new_group(backend="gloo")
+    if rank == 0:
+        print(
+            f"Dataloader settings: pin_memory={args.pin_memory},"
+            f" num_workers={args.num_workers},"
+            f" prefetch_factor={args.prefetch_factor if args.num_workers > 0 else None}"
         )
     train_loader = NvtBinaryDataloader(
         binary_file_path=os.path.join(args.binary_path, "train"),
         batch_size=args.batch_size,
-    ).get_dataloader(rank=rank, world_size=world_size)
+    ).get_dataloader(
+        rank=rank,
+        world_size=world_size,
+        num_workers=args.num_workers,
+        prefetch_factor=args.prefetch_factor,
+        # Batch implements pin_memory(), so the DataLoader can pin whole batches.
+        pin_memory=args.pin_memory,
+    )
     val_loader = NvtBinaryDataloader(
         binary_file_path=os.path.join(args.binary_path, "validation"),
         batch_size=args.batch_size,
-    ).get_dataloader(rank=rank, world_size=world_size)
+    ).get_dataloader(
+        rank=rank,
+        world_size=world_size,
+        num_workers=args.num_workers,
+        prefetch_factor=args.prefetch_factor,
+        pin_memory=args.pin_memory,
+    )
 
     test_loader = NvtBinaryDataloader(
         binary_file_path=os.path.join(args.binary_path, "test"),
         batch_size=args.batch_size,
-    ).get_dataloader(rank=rank, world_size=world_size)
+    ).get_dataloader(
+        rank=rank,
+        world_size=world_size,
+        num_workers=args.num_workers,
+        prefetch_factor=args.prefetch_factor,
+        pin_memory=args.pin_memory,
+    )
 
+    num_embeddings_per_feature = (
+        args.num_embeddings_per_feature
+        if args.num_embeddings_per_feature is not None
+        else [args.num_embeddings] * len(DEFAULT_CAT_NAMES)
+    )
     eb_configs = [
         EmbeddingBagConfig(
             name=f"t_{feature_name}",
             embedding_dim=args.embedding_dim,
-            num_embeddings=none_throws(num_embeddings_per_feature)[feature_idx]
-            if num_embeddings_per_feature is not None
-            else args.num_embeddings,
+            num_embeddings=num_embeddings_per_feature[feature_idx],
             feature_names=[feature_name],
         )
         for feature_idx, feature_name in enumerate(DEFAULT_CAT_NAMES)
@@ -222,10 +311,8 @@ def main(argv: List[str]):
                 tables=eb_configs, device=torch.device("meta")
             ),
             dense_in_features=len(DEFAULT_INT_NAMES),
-            dense_arch_layer_sizes=list(
-                map(int, args.dense_arch_layer_sizes.split(","))
-            ),
-            over_arch_layer_sizes=list(map(int, args.over_arch_layer_sizes.split(","))),
+            dense_arch_layer_sizes=args.dense_arch_layer_sizes,
+            over_arch_layer_sizes=args.over_arch_layer_sizes,
             dense_device=device,
         ),
     )
@@ -327,7 +414,7 @@ def main(argv: List[str]):
                     # metrics calculation
                     validation_it = iter(val_loader)
                     auroc_result, accuracy_result, bce_loss = _eval(
-                        train_pipeline, validation_it
+                        train_pipeline, validation_it, cpu_process_group
                     )
                     if rank == 0:
                         print(f"AUROC over validation set: {auroc_result}.")
@@ -339,7 +426,7 @@ def main(argv: List[str]):
 
                     test_it = iter(test_loader)
                     auroc_result, accuracy_result, bce_loss = _eval(
-                        train_pipeline, test_it
+                        train_pipeline, test_it, cpu_process_group
                     )
                     if rank == 0:
                         print(f"AUROC over test set: {auroc_result}.")
@@ -356,7 +443,9 @@ def main(argv: List[str]):
 
         # eval
         val_it = iter(val_loader)
-        auroc_result, accuracy_result, bce_loss = _eval(train_pipeline, val_it)
+        auroc_result, accuracy_result, bce_loss = _eval(
+            train_pipeline, val_it, cpu_process_group
+        )
         if rank == 0:
             print(f"AUROC over validation set: {auroc_result}.")
             print(f"Accuracy over validation set: {accuracy_result}.")
@@ -366,7 +455,9 @@ def main(argv: List[str]):
             )
         # test
         test_it = iter(test_loader)
-        auroc_result, accuracy_result, bce_loss = _eval(train_pipeline, test_it)
+        auroc_result, accuracy_result, bce_loss = _eval(
+            train_pipeline, test_it, cpu_process_group
+        )
         if rank == 0:
             print(f"AUROC over test set: {auroc_result}.")
             print(f"Accuracy over test set: {accuracy_result}.")